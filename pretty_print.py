@@ -11,7 +11,71 @@ Usage: pi --print --mode json "prompt" | ./pretty_print.py
 import sys
 import json
 import os
-from datetime import datetime
+import re
+import time
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Optional, cast
+
+# orjson is optional; it decodes the stream considerably faster than json.
+_loads: Callable[[bytes], Any]
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: object) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: object) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+# pysimdjson is optional as well. pi repeats the whole partial assistant
+# message in every message_update; parsing those lazily means it is never
+# turned into Python objects. Other frames are small or read in full, so they
+# always go to _loads.
+try:
+    import simdjson
+
+    _HAVE_SIMDJSON = True
+except ImportError:
+    _HAVE_SIMDJSON = False
+
+_parse_update: Callable[[bytes], Any]
+if _HAVE_SIMDJSON:
+    _parser = simdjson.Parser()
+
+    def _materialize(value: object) -> object:
+        if isinstance(value, simdjson.Object):
+            return value.as_dict()
+        if isinstance(value, simdjson.Array):
+            return value.as_list()
+        return value
+
+    def _parse_lazily(line: bytes) -> Any:
+        """Parse a message_update line, materializing only what is read.
+
+        No simdjson proxy outlives this call, as the parser refuses to be
+        reused while any exist.
+        """
+        doc = cast(simdjson.Object, _parser.parse(line))
+        data: dict[str, object] = {"type": "message_update"}
+        event = doc.get("assistantMessageEvent")
+        if isinstance(event, simdjson.Object):
+            data["assistantMessageEvent"] = {
+                k: _materialize(event.get(k)) for k in event.keys() if k != "partial"
+            }
+        elif event is not None:
+            data["assistantMessageEvent"] = _materialize(event)
+        return data
+
+    _parse_update = _parse_lazily
+
+else:
+    _parse_update = _loads
+
 
 # ============================================================================
 # CONFIGURATION
@@ -20,6 +84,9 @@ from datetime import datetime
 # Maximum lines of output to show per tool (can be overridden via PRETTY_PRINT_MAX_LINES env var)
 MAX_LINES = int(os.environ.get("PRETTY_PRINT_MAX_LINES", "100"))
 
+# Bytes requested per read from stdin
+READ_SIZE = 64 * 1024
+
 # Enable debug output (can be overridden via PRETTY_PRINT_DEBUG env var)
 DEBUG = os.environ.get("PRETTY_PRINT_DEBUG", "false").lower() in ("true", "1", "yes")
 
@@ -50,6 +117,28 @@ class C:
     BG_BLUE = "\033[44m"
 
 
+class Cb:
+    """ANSI color codes as bytes, for the buffered output path."""
+
+    RESET = b"\033[0m"
+    BOLD = b"\033[1m"
+    DIM = b"\033[2m"
+    ITALIC = b"\033[3m"
+
+    RED = b"\033[31m"
+    GREEN = b"\033[32m"
+    YELLOW = b"\033[33m"
+    BLUE = b"\033[34m"
+    MAGENTA = b"\033[35m"
+    CYAN = b"\033[36m"
+    WHITE = b"\033[37m"
+    GRAY = b"\033[90m"
+
+    BG_RED = b"\033[41m"
+    BG_YELLOW = b"\033[43m"
+    BG_BLUE = b"\033[44m"
+
+
 ICONS = {
     "assistant": "🤖",
     "tool": "🔧",
@@ -97,57 +186,74 @@ TOOL_ICONS = {
     "question": "❓",
 }
 
+# Longest keys first, so e.g. "todowrite" wins over "write"
+_TOOL_RE = re.compile(
+    "|".join(sorted(map(re.escape, TOOL_ICONS), key=len, reverse=True))
+)
+
 # ============================================================================
 # UTILITIES
 # ============================================================================
 
 
+@lru_cache(maxsize=256)
 def get_tool_icon(tool_name: str) -> str:
     """Map tool name to appropriate icon."""
-    name_lower = tool_name.lower()
-    for key, icon in TOOL_ICONS.items():
-        if key in name_lower:
-            return icon
-    return ICONS["tool"]
+    m = _TOOL_RE.search(tool_name.lower())
+    return TOOL_ICONS[m.group()] if m else ICONS["tool"]
+
+
+# Line breaks and tabs become spaces in single-line previews
+_NL_TRANS = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
 
 
 def truncate(s: str, max_len: int = 100) -> str:
     """Truncate string with ellipsis."""
-    s = s.replace("\n", " ").strip()
+    # Short single-line strings need no translation; isprintable() rules out
+    # line breaks and tabs in one pass
+    if len(s) <= max_len and s.isprintable():
+        return s.strip()
+    s = s.translate(_NL_TRANS).strip()
     if len(s) <= max_len:
         return s
     return s[: max_len - 3] + "..."
 
 
+# Argument names tools use for the same thing, in order of preference.
+# Handle both 'path' and 'file_path' (Read tool uses file_path)
+_PATH_KEYS = ("path", "file_path")
+_CONTENT_KEYS = ("content", "file_text", "newString", "newText")
+_OLD_KEYS = ("oldString", "old_str", "oldText")
+_QUERY_KEYS = ("query", "pattern")
+
+
+def _first(d: dict, keys: tuple) -> Any:
+    """Return the first truthy value among keys, or None."""
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return v
+    return None
+
+
 def format_tool_input(tool_name: str, input_data: dict) -> str:
     """Format tool input for display."""
     if not input_data:
         return ""
     if "command" in input_data:
         return truncate(input_data["command"], 80)
-    # Handle both 'path' and 'file_path' (Read tool uses file_path)
-    path = input_data.get("path") or input_data.get("file_path")
+    keys = input_data.keys()
+    path = _first(input_data, _PATH_KEYS)
     if path:
-        if (
-            "content" in input_data
-            or "file_text" in input_data
-            or "newString" in input_data
-            or "newText" in input_data
-        ):
-            content = (
-                input_data.get("content")
-                or input_data.get("file_text")
-                or input_data.get("newString")
-                or input_data.get("newText", "")
-            )
+        if not keys.isdisjoint(_CONTENT_KEYS):
+            content = _first(input_data, _CONTENT_KEYS) or ""
             lines = content.count("\n") + 1
             return f"{path} ({lines} lines)"
-        if "oldString" in input_data or "old_str" in input_data or "oldText" in input_data:
+        if not keys.isdisjoint(_OLD_KEYS):
             return f"editing {path}"
         return path
-    if "query" in input_data or "pattern" in input_data:
-        query = input_data.get("query") or input_data.get("pattern", "")
-        return truncate(query, 60)
+    if not keys.isdisjoint(_QUERY_KEYS):
+        return truncate(_first(input_data, _QUERY_KEYS) or "", 60)
     if "questions" in input_data:
         return f"asking {len(input_data['questions'])} question(s)"
     if "prompt" in input_data:
@@ -155,36 +261,139 @@ def format_tool_input(tool_name: str, input_data: dict) -> str:
 
     # Fallback: show truncated JSON
     try:
-        return truncate(json.dumps(input_data), 60)
+        return truncate(_bounded_json(input_data, 60), 60)
     except:
         return truncate(str(input_data), 60)
 
 
-def format_tool_result(result: str, max_lines: int = 12) -> str:
+def _bounded_json(d: dict, limit: int) -> str:
+    """Serialize d as compact JSON, stopping once past the first limit chars.
+
+    The result matches _dumps(d) wherever it is no longer than limit, so it
+    can stand in for it before truncating to that length.
+    """
+    items = []
+    size = 1
+    for k, v in d.items():
+        if size > limit:
+            break
+        if isinstance(v, str):
+            # Escaping is per character, so this still serializes to a
+            # prefix of the full value
+            v = v[:limit]
+        item = _dumps(k) + ":" + _dumps(v)
+        items.append(item)
+        size += len(item) + 1
+    return "{" + ",".join(items) + "}"
+
+
+def format_tool_result(result: str, max_lines: int = MAX_LINES) -> str:
     """Format tool result with smart truncation."""
-    if not result or not result.strip():
+    if not result or result.isspace():
         return f"{C.DIM}(empty){C.RESET}"
 
-    lines = result.split("\n")
+    newlines = result.count("\n")
 
-    if len(lines) <= max_lines:
+    if newlines < max_lines:
         return result
 
-    # Show head and tail
+    # Show head and tail, sliced out of result by newline offsets rather
+    # than splitting every line
     head_count = max_lines // 2
     tail_count = max_lines - head_count - 1
 
-    head = lines[:head_count]
-    tail = lines[-tail_count:] if tail_count > 0 else []
-    omitted = len(lines) - head_count - tail_count
+    find, rfind = result.find, result.rfind
+    head_end = -1
+    for _ in range(head_count):
+        head_end = find("\n", head_end + 1)
+    tail_start = len(result)
+    for _ in range(tail_count):
+        tail_start = rfind("\n", 0, tail_start)
+    omitted = newlines + 1 - head_count - tail_count
+
+    out = f"{C.DIM}    ... ({omitted} lines omitted) ...{C.RESET}"
+    if head_count > 0:
+        out = result[:head_end] + "\n" + out
+    if tail_count > 0:
+        out += result[tail_start:]
+    return out
 
-    parts = head + [f"{C.DIM}    ... ({omitted} lines omitted) ...{C.RESET}"] + tail
-    return "\n".join(parts)
 
+_STDERR_FD = 2
 
-def stderr(msg: str):
+
+def stderr(msg: str) -> None:
     """Write to stderr for loop.sh to capture."""
-    print(msg, file=sys.stderr, flush=True)
+    # Keep the stdout lines that led up to this in front of it on a terminal
+    _flush()
+    data = memoryview(msg.encode("utf-8", "replace") + b"\n")
+    while data:
+        data = data[os.write(_STDERR_FD, data) :]
+
+
+# ============================================================================
+# BUFFERED OUTPUT
+# ============================================================================
+
+# Output is assembled as bytes and written straight to sys.stdout.buffer.
+# Nothing is flushed per write: the main loop flushes once per input event,
+# holding back only an unfinished line of streamed text. Text deltas arrive a
+# few tokens at a time and are written out as soon as a full line is available.
+_OUT = sys.stdout.buffer
+_out_buf = bytearray()
+
+# Pre-encoded pieces of output lines
+_END = Cb.RESET + b"\n"
+_PFX_TOOL = b"\n" + Cb.BLUE
+_SFX_TOOL = Cb.RESET + b" " + Cb.DIM + b"-> "
+_PFX_INDENT = b"  " + Cb.DIM
+_SEP_INDENT = Cb.RESET + b"\n" + _PFX_INDENT
+_PFX_RATE_LIMIT = Cb.YELLOW + f"{ICONS['rate_limit']} ".encode()
+_PFX_TOOL_ERROR = Cb.RED + f"{ICONS['error']} Error: ".encode()
+_ERROR_BANNER = (
+    b"\n" + Cb.BG_RED + Cb.WHITE + f" {ICONS['error']} ERROR ".encode() + _END
+)
+
+
+@lru_cache(maxsize=256)
+def _tool_label(tool_name: str) -> bytes:
+    """Encoded start of a tool header: newline, colour, icon and name."""
+    return _PFX_TOOL + f"{get_tool_icon(tool_name)} {tool_name}".encode()
+
+
+def _write(s: str) -> None:
+    """Buffer text output, flushing once a newline is seen."""
+    _out_buf.extend(s.encode())
+    if "\n" in s:
+        _flush()
+
+
+def _write_bytes(b: bytes) -> None:
+    """Buffer pre-encoded output until the end of the current event."""
+    _out_buf.extend(b)
+
+
+def _debug(msg: str) -> None:
+    """Write a dimmed [DEBUG] line; callers check DEBUG before formatting."""
+    _write(f"{C.DIM}[DEBUG] {msg}{C.RESET}\n")
+
+
+def _write_block(*parts: bytes) -> None:
+    """Buffer the pre-encoded parts of complete lines.
+
+    Used for large output, which would otherwise be copied once more for
+    every concatenation before reaching the buffer.
+    """
+    for part in parts:
+        _out_buf.extend(part)
+
+
+def _flush() -> None:
+    """Write out any buffered output."""
+    if _out_buf:
+        _OUT.write(_out_buf)
+        _out_buf.clear()
+        _OUT.flush()
 
 
 # ============================================================================
@@ -192,312 +401,384 @@ def stderr(msg: str):
 # ============================================================================
 
 
+# Completion signal lines, as they read once stripped of surrounding
+# whitespace (other than the newlines that delimit them)
+_SIGNAL_RE = re.compile(r"^[^\S\n]*((?:DONE|BLOCKED)\|[^\n]*?)[^\S\n]*$", re.M)
+
+# Frames for message types that are never displayed, as pi writes them. They
+# are dropped without parsing; message_start/message_end carry the whole
+# message. Other spellings still reach handle_ignored.
+_IGNORED_FRAMES = (
+    b'{"type":"session"',
+    b'{"type":"message_start"',
+    b'{"type":"message_end"',
+)
+# message_update frames as pi writes them, which are parsed with _parse_update
+_UPDATE_FRAME = b'{"type":"message_update"'
+
+
 class StreamProcessor:
-    def __init__(self):
-        self.current_text = ""
+    __slots__ = (
+        "_pending_parts",
+        "_signals",
+        "in_text_block",
+        "in_thinking_block",
+        "current_tool",
+        "current_tool_id",
+        "tool_calls",
+        "tokens_in",
+        "tokens_out",
+        "tokens_cache_read",
+        "start_time",
+        "_dispatch",
+        "_event_dispatch",
+    )
+
+    def __init__(self) -> None:
+        # Completion signals are picked out of the text as it streams in;
+        # the transcript itself is not retained
+        self._pending_parts: list[str] = []
+        self._signals: list[str] = []
         self.in_text_block = False
         self.in_thinking_block = False
-        self.current_tool = None
-        self.current_tool_id = None
-        self.stats = {
-            "tool_calls": 0,
-            "tokens_in": 0,
-            "tokens_out": 0,
-            "tokens_cache_read": 0,
-            "start_time": datetime.now(),
+        self.current_tool: Optional[str] = None
+        self.current_tool_id: Optional[str] = None
+        # Stats
+        self.tool_calls = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.tokens_cache_read = 0
+        self.start_time = time.monotonic()
+        # pi message types; anything not listed is unknown
+        self._dispatch: dict[str, Callable[[dict], None]] = {
+            "message_update": self.handle_message_update,
+            "tool_execution_start": self.handle_tool_execution_start,
+            "tool_execution_end": self.handle_tool_execution_end,
+            "turn_end": self.handle_turn_end,
+            "agent_end": self.handle_agent_end,
+            "error": self.handle_error,
+            "agent_start": self.handle_agent_start,
+            "turn_start": self.handle_turn_start,
+            "session": self.handle_ignored,
+            "message_start": self.handle_ignored,
+            "message_end": self.handle_ignored,
+        }
+        # assistantMessageEvent types; thinking_delta, toolcall_start and
+        # toolcall_delta need no handling (tool calls are shown on toolcall_end)
+        self._event_dispatch: dict[str, Callable[[dict], None]] = {
+            "thinking_start": self.handle_thinking_start,
+            "thinking_end": self.handle_thinking_end,
+            "text_start": self.handle_text_start,
+            "text_delta": self.handle_text_delta,
+            "text_end": self.handle_text_end,
+            "toolcall_end": self.handle_toolcall_end,
         }
         if DEBUG:
-            print(
-                f"{C.DIM}[DEBUG] StreamProcessor initialized at {self.stats['start_time'].strftime('%H:%M:%S')}{C.RESET}",
-                flush=True,
-            )
+            _debug(f"StreamProcessor initialized at {time.strftime('%H:%M:%S')}")
 
-    def process_line(self, line: str):
-        """Process a single line of stream output."""
-        line = line.strip()
+    def process_line(self, line: bytes) -> None:
+        """Process a single raw line of stream output."""
+        if line:
+            line = line.strip()
         if not line:
             if DEBUG:
-                print(f"{C.DIM}[DEBUG] Empty line skipped{C.RESET}", flush=True)
+                _debug("Empty line skipped")
             return
 
         # Check for rate limit or error in plain text
-        if not line.startswith("{"):
+        if not line.startswith(b"{"):
             lower = line.lower()
-            if "you've hit your limit" in lower or "rate limit" in lower:
-                print(f"{C.YELLOW}{ICONS['rate_limit']} {line}{C.RESET}")
-                stderr(line)
+            # Both rate limit phrasings contain "limit"; test that once
+            # before looking for either
+            if b"limit" in lower and (
+                b"you've hit your limit" in lower or b"rate limit" in lower
+            ):
+                _write_bytes(_PFX_RATE_LIMIT + line + _END)
+                stderr(line.decode("utf-8", "replace"))
                 return
-            if "error" in lower:
-                print(f"{C.RED}{line}{C.RESET}")
-                stderr(line)
+            if b"error" in lower:
+                _write_bytes(Cb.RED + line + _END)
+                stderr(line.decode("utf-8", "replace"))
                 return
             # Other non-JSON output
             if DEBUG:
-                print(
-                    f"{C.DIM}[DEBUG] Non-JSON line: {line[:100]}{C.RESET}", flush=True
-                )
+                text = line.decode("utf-8", "replace")
+                _debug(f"Non-JSON line: {text[:100]}")
             else:
-                print(f"{C.DIM}{line}{C.RESET}")
+                _write_bytes(Cb.DIM + line + _END)
             return
 
-        # Try to parse as JSON
-        try:
-            data = json.loads(line)
-        except json.JSONDecodeError:
+        if line.startswith(_IGNORED_FRAMES):
+            return
+
+        # Try to parse as JSON; every decoder takes the raw bytes directly.
+        # A line that doesn't close its object can't parse, so it skips the
+        # decoder and the exception it would raise.
+        data = None
+        if line.endswith(b"}"):
+            parse = _parse_update if line.startswith(_UPDATE_FRAME) else _loads
+            try:
+                data = parse(line)
+            except ValueError:
+                pass
+        if data is None:
             if DEBUG:
-                print(
-                    f"{C.DIM}[DEBUG] Failed to parse JSON: {line[:100]}{C.RESET}",
-                    flush=True,
-                )
+                text = line.decode("utf-8", "replace")
+                _debug(f"Failed to parse JSON: {text[:100]}")
             else:
-                print(f"{C.DIM}{line}{C.RESET}")
+                _write_bytes(Cb.DIM + line + _END)
             return
 
         self.handle_message(data)
 
-    def handle_message(self, data: dict):
+    def handle_message(self, data: dict) -> None:
         """Handle a parsed JSON message (pi format)."""
         msg_type = data.get("type", "")
-
-        # pi event types
-        if msg_type == "message_update":
-            self.handle_message_update(data)
-        elif msg_type == "tool_execution_start":
-            self.handle_tool_execution_start(data)
-        elif msg_type == "tool_execution_end":
-            self.handle_tool_execution_end(data)
-        elif msg_type == "turn_end":
-            self.handle_turn_end(data)
-        elif msg_type == "agent_end":
-            self.handle_agent_end(data)
-        elif msg_type == "error":
-            self.handle_error(data)
-        elif msg_type == "session":
-            # Session metadata, ignore
-            pass
-        elif msg_type == "agent_start":
-            if DEBUG:
-                print(f"{C.DIM}[DEBUG] Agent started{C.RESET}", flush=True)
-        elif msg_type == "turn_start":
-            if DEBUG:
-                print(f"{C.DIM}[DEBUG] Turn started{C.RESET}", flush=True)
-        elif msg_type == "message_start":
-            # Message metadata, ignore
-            pass
-        elif msg_type == "message_end":
-            # Message end, ignore
-            pass
-        else:
+        handler = self._dispatch.get(msg_type)
+        if handler:
+            handler(data)
+        elif msg_type and DEBUG:
             # Log unknown message types for debugging
-            if msg_type and DEBUG:
-                print(
-                    f"{C.DIM}[DEBUG] Unknown message type: {msg_type}{C.RESET}",
-                    flush=True,
-                )
+            _debug(f"Unknown message type: {msg_type}")
+
+    def handle_ignored(self, data: dict) -> None:
+        """Handle metadata messages that have nothing to display."""
+
+    def handle_agent_start(self, data: dict) -> None:
+        """Handle agent start."""
+        if DEBUG:
+            _debug("Agent started")
 
-    def handle_message_update(self, data: dict):
+    def handle_turn_start(self, data: dict) -> None:
+        """Handle turn start."""
+        if DEBUG:
+            _debug("Turn started")
+
+    def handle_message_update(self, data: dict) -> None:
         """Handle message_update events from pi."""
-        event = data.get("assistantMessageEvent", {})
+        event = data.get("assistantMessageEvent") or {}
         event_type = event.get("type", "")
-        
-        if event_type == "thinking_start":
-            if not self.in_thinking_block:
-                if DEBUG:
-                    print(f"{C.DIM}[DEBUG] Thinking block started{C.RESET}", flush=True)
-                self.in_thinking_block = True
-                
-        elif event_type == "thinking_delta":
-            # We don't print thinking by default, just accumulate
-            pass
-            
-        elif event_type == "thinking_end":
-            self.in_thinking_block = False
+        handler = self._event_dispatch.get(event_type)
+        if handler:
+            handler(event)
+
+    def handle_thinking_start(self, event: dict) -> None:
+        """Handle start of a thinking block."""
+        if not self.in_thinking_block:
             if DEBUG:
-                print(f"{C.DIM}[DEBUG] Thinking block ended{C.RESET}", flush=True)
-                
-        elif event_type == "text_start":
-            if not self.in_text_block:
-                if DEBUG:
-                    print(f"{C.DIM}[DEBUG] Text block started{C.RESET}", flush=True)
-                self.in_text_block = True
-                
-        elif event_type == "text_delta":
-            delta = event.get("delta", "")
-            if delta:
-                print(delta, end="", flush=True)
-                self.current_text += delta
-                
-        elif event_type == "text_end":
-            if self.in_text_block:
-                print()  # End the line
-                self.in_text_block = False
-                
-        elif event_type == "toolcall_start":
-            pass  # Tool call starting, wait for delta
-            
-        elif event_type == "toolcall_delta":
-            # Tool call arguments being streamed, we'll handle on toolcall_end
-            pass
-            
-        elif event_type == "toolcall_end":
-            tool_call = event.get("toolCall", {})
-            tool_name = tool_call.get("name", "unknown")
-            tool_args = tool_call.get("arguments", {})
-            tool_id = tool_call.get("id", "")
-            
-            # End any text block
-            if self.in_text_block:
-                print()
-                self.in_text_block = False
-            
-            # Print tool invocation
-            icon = get_tool_icon(tool_name)
-            formatted = format_tool_input(tool_name, tool_args)
-            
-            if formatted:
-                print(f"\n{C.BLUE}{icon} {tool_name}{C.RESET} {C.DIM}-> {formatted}{C.RESET}")
-            else:
-                print(f"\n{C.BLUE}{icon} {tool_name}{C.RESET}")
-            
+                _debug("Thinking block started")
+            self.in_thinking_block = True
+
+    def handle_thinking_end(self, event: dict) -> None:
+        """Handle end of a thinking block."""
+        self.in_thinking_block = False
+        if DEBUG:
+            _debug("Thinking block ended")
+
+    def handle_text_start(self, event: dict) -> None:
+        """Handle start of a text block."""
+        if not self.in_text_block:
             if DEBUG:
-                print(f"{C.DIM}[DEBUG] Tool started: {tool_name}{C.RESET}", flush=True)
-            
-            self.stats["tool_calls"] += 1
-            self.current_tool = tool_name
-            self.current_tool_id = tool_id
+                _debug("Text block started")
+            self.in_text_block = True
+
+    def handle_text_delta(self, event: dict) -> None:
+        """Handle streamed assistant text."""
+        delta = event.get("delta", "")
+        if delta:
+            _write(delta)
+            self._scan_signals(delta)
+
+    def _scan_signals(self, text: str) -> None:
+        """Collect completed DONE|/BLOCKED| lines from streamed text."""
+        self._pending_parts.append(text)
+        if "\n" not in text:
+            return
+        text = "".join(self._pending_parts)
+        end = text.rfind("\n")
+        self._pending_parts = [text[end + 1 :]]
+        if "|" in text:
+            self._signals.extend(_SIGNAL_RE.findall(text, 0, end))
 
-    def handle_tool_execution_start(self, data: dict):
+    def _check_signal(self, line: str) -> None:
+        line = line.strip()
+        if line.startswith(("DONE|", "BLOCKED|")):
+            self._signals.append(line)
+
+    def handle_text_end(self, event: dict) -> None:
+        """Handle end of a text block."""
+        if self.in_text_block:
+            _write_bytes(b"\n")  # End the line
+            self.in_text_block = False
+
+    def handle_toolcall_end(self, event: dict) -> None:
+        """Handle a completed tool call by printing the invocation."""
+        tool_call = event.get("toolCall") or {}
+        get = tool_call.get
+        tool_name = get("name", "unknown")
+        tool_args = get("arguments") or {}
+        tool_id = get("id", "")
+
+        # End any text block
+        if self.in_text_block:
+            _write_bytes(b"\n")
+            self.in_text_block = False
+
+        self._emit_tool(tool_name, tool_args)
+
+        if DEBUG:
+            _debug(f"Tool started: {tool_name}")
+
+        self.current_tool = tool_name
+        self.current_tool_id = tool_id
+
+    def _emit_tool(self, tool_name: str, tool_args: dict) -> None:
+        """Print a tool invocation header and count the call."""
+        formatted = format_tool_input(tool_name, tool_args)
+        if formatted:
+            _write_bytes(
+                _tool_label(tool_name) + _SFX_TOOL + formatted.encode() + _END
+            )
+        else:
+            _write_bytes(_tool_label(tool_name) + _END)
+        self.tool_calls += 1
+
+    def handle_tool_execution_start(self, data: dict) -> None:
         """Handle tool execution start."""
         if DEBUG:
             tool_name = data.get("toolName", "unknown")
-            print(f"{C.DIM}[DEBUG] Tool execution started: {tool_name}{C.RESET}", flush=True)
+            _debug(f"Tool execution started: {tool_name}")
 
-    def handle_tool_execution_end(self, data: dict):
+    def handle_tool_execution_end(self, data: dict) -> None:
         """Handle tool execution end with result."""
-        tool_name = data.get("toolName", "unknown")
-        result = data.get("result", {})
-        is_error = data.get("isError", False)
+        get = data.get
+        result = get("result", {})
+        is_error = get("isError", False)
         
-        # Extract text from result
-        output_text = ""
-        if isinstance(result, dict):
-            content = result.get("content", [])
-            if isinstance(content, list):
-                for item in content:
-                    if isinstance(item, dict) and item.get("type") == "text":
-                        output_text += item.get("text", "")
-            else:
-                output_text = str(result)
+        # Extract text from result; anything else is converted once, and
+        # only if it isn't already a string
+        content = result.get("content", []) if isinstance(result, dict) else None
+        if isinstance(content, list):
+            output_text = "".join(
+                item.get("text", "")
+                for item in content
+                if isinstance(item, dict) and item.get("type") == "text"
+            )
+        elif isinstance(result, str):
+            output_text = result
         else:
             output_text = str(result)
-        
+
         if is_error:
-            print(f"{C.RED}{ICONS['error']} Error: {truncate(output_text, 200)}{C.RESET}")
+            _write_bytes(
+                _PFX_TOOL_ERROR + truncate(output_text, 200).encode() + _END
+            )
             stderr(f"TOOL_ERROR: {output_text}")
-        elif output_text and output_text.strip():
+        elif output_text and not output_text.isspace():
             if MAX_LINES == 0:
                 formatted = output_text
             else:
-                formatted = format_tool_result(output_text, max_lines=MAX_LINES)
-            indented = "\n".join(
-                f"  {C.DIM}{line}{C.RESET}" for line in formatted.split("\n")
+                formatted = format_tool_result(output_text)
+            _write_block(
+                _PFX_INDENT, formatted.encode().replace(b"\n", _SEP_INDENT), _END
             )
-            print(indented)
         
         self.current_tool = None
         self.current_tool_id = None
 
-    def handle_turn_end(self, data: dict):
+    def handle_turn_end(self, data: dict) -> None:
         """Handle turn end with token counts."""
         if self.in_text_block:
-            print()
+            _write_bytes(b"\n")
             self.in_text_block = False
         
-        message = data.get("message", {})
-        usage = message.get("usage", {})
-        
+        usage = (data.get("message") or {}).get("usage")
+
         if usage:
-            self.stats["tokens_in"] = usage.get("input", 0) + usage.get("cacheRead", 0)
-            self.stats["tokens_out"] = usage.get("output", 0)
-            self.stats["tokens_cache_read"] = usage.get("cacheRead", 0)
+            get = usage.get
+            cache_read = get("cacheRead", 0)
+            self.tokens_in = get("input", 0) + cache_read
+            self.tokens_out = get("output", 0)
+            self.tokens_cache_read = cache_read
             
             if DEBUG:
-                print(
-                    f"{C.DIM}[DEBUG] Turn ended - tokens: in={self.stats['tokens_in']}, out={self.stats['tokens_out']}, cache={self.stats['tokens_cache_read']}{C.RESET}",
-                    flush=True,
+                _debug(
+                    f"Turn ended - tokens: in={self.tokens_in}, out={self.tokens_out}, cache={self.tokens_cache_read}"
                 )
 
-    def handle_agent_end(self, data: dict):
+    def handle_agent_end(self, data: dict) -> None:
         """Handle agent end - final summary."""
         if self.in_text_block:
-            print()
+            _write_bytes(b"\n")
             self.in_text_block = False
         
         if DEBUG:
-            print(f"{C.DIM}[DEBUG] Agent ended{C.RESET}", flush=True)
+            _debug("Agent ended")
 
-    def handle_error(self, data: dict):
+    def handle_error(self, data: dict) -> None:
         """Handle error message."""
         error_msg = data.get("error", "") or data.get("message", str(data))
         
-        print(f"\n{C.BG_RED}{C.WHITE} {ICONS['error']} ERROR {C.RESET}")
-        print(f"{C.RED}{error_msg}{C.RESET}")
+        _write_bytes(_ERROR_BANNER + Cb.RED + f"{error_msg}".encode() + _END)
         stderr(f"ERROR: {error_msg}")
 
-    def finalize(self):
+    def finalize(self) -> None:
         """Print final stats and check for completion signals."""
         # End any text block
         if self.in_text_block:
-            print()
+            _write_bytes(b"\n")
 
-        duration = (datetime.now() - self.stats["start_time"]).seconds
+        duration = int(time.monotonic() - self.start_time)
 
         # Token summary
-        total_in = self.stats["tokens_in"]
-        total_out = self.stats["tokens_out"]
+        total_in = self.tokens_in
+        total_out = self.tokens_out
 
         if DEBUG:
-            print(
-                f"{C.DIM}[DEBUG] Finalizing: duration={duration}s, tools={self.stats['tool_calls']}, tokens_in={total_in}, tokens_out={total_out}{C.RESET}",
-                flush=True,
+            _debug(
+                f"Finalizing: duration={duration}s, tools={self.tool_calls}, tokens_in={total_in}, tokens_out={total_out}"
             )
 
-        print(f"\n{C.DIM}{'─' * 50}{C.RESET}")
-        print(
-            f"{C.DIM}⏱  {duration}s  │  "
-            f"🔧 {self.stats['tool_calls']} tools  │  "
-            f"📥 {total_in}  📤 {total_out} tokens{C.RESET}"
+        _write_bytes(b"\n" + Cb.DIM + ("─" * 50).encode() + _END)
+        _write_bytes(
+            Cb.DIM
+            + (
+                f"⏱  {duration}s  │  "
+                f"🔧 {self.tool_calls} tools  │  "
+                f"📥 {total_in}  📤 {total_out} tokens"
+            ).encode()
+            + _END
         )
 
         # Output to stderr for loop.sh to capture
-        stderr(f"🔧 {self.stats['tool_calls']}")
+        stderr(f"🔧 {self.tool_calls}")
         stderr(f"📥 {total_in}")
         stderr(f"📤 {total_out}")
 
-        # Check for and pass completion signals in accumulated text
+        # Pass on completion signals seen in the streamed text
+        self._check_signal("".join(self._pending_parts))
+        self._pending_parts = []
+
         if DEBUG:
-            print(
-                f"{C.DIM}[DEBUG] Checking for completion signals in accumulated text ({len(self.current_text)} chars){C.RESET}",
-                flush=True,
-            )
+            _debug(f"Found {len(self._signals)} completion signal(s) in streamed text")
 
-        for line in self.current_text.split("\n"):
-            line = line.strip()
+        for line in self._signals:
             if line.startswith("DONE|"):
-                print(f"{C.GREEN}{ICONS['done']} Task completed{C.RESET}")
+                _write_bytes(
+                    Cb.GREEN + f"{ICONS['done']} Task completed".encode() + _END
+                )
                 stderr(line)
                 if DEBUG:
-                    print(
-                        f"{C.DIM}[DEBUG] Found DONE signal: {line}{C.RESET}", flush=True
-                    )
-            elif line.startswith("BLOCKED|"):
-                print(f"{C.YELLOW}{ICONS['blocked']} Task blocked{C.RESET}")
+                    _debug(f"Found DONE signal: {line}")
+            else:
+                _write_bytes(
+                    Cb.YELLOW + f"{ICONS['blocked']} Task blocked".encode() + _END
+                )
                 stderr(line)
                 if DEBUG:
-                    print(
-                        f"{C.DIM}[DEBUG] Found BLOCKED signal: {line}{C.RESET}",
-                        flush=True,
-                    )
+                    _debug(f"Found BLOCKED signal: {line}")
+
+        _flush()
 
 
 # ============================================================================
@@ -505,22 +786,43 @@ class StreamProcessor:
 # ============================================================================
 
 
-def main():
+def read_lines(fd: int, size: int = READ_SIZE) -> Iterator[bytes]:
+    """Yield lines from fd, reading it in large chunks rather than per line."""
+    tail: list[bytes] = []
+    while True:
+        chunk = os.read(fd, size)
+        if not chunk:
+            break
+        lines = chunk.split(b"\n")
+        if len(lines) > 1:
+            tail.append(lines[0])
+            lines[0] = b"".join(tail)
+            tail = []
+        tail.append(lines.pop())
+        yield from lines
+    last = b"".join(tail)
+    if last:
+        yield last
+
+
+def main() -> None:
     processor = StreamProcessor()
 
     line_count = 0
     try:
-        for line in sys.stdin:
+        for line in read_lines(sys.stdin.fileno()):
             line_count += 1
             if line_count == 1:
                 # First line received
-                print(
-                    f"\n{C.DIM}[pretty_print] Receiving stream data...{C.RESET}",
-                    flush=True,
+                _write_bytes(
+                    b"\n" + Cb.DIM + b"[pretty_print] Receiving stream data..." + _END
                 )
             processor.process_line(line)
+            # One write per event; an unfinished line of text waits for more
+            if _out_buf.endswith(b"\n"):
+                _flush()
     except KeyboardInterrupt:
-        print(f"\n{C.YELLOW}Interrupted{C.RESET}")
+        _write_bytes(b"\n" + Cb.YELLOW + b"Interrupted" + _END)
         sys.exit(130)
     except BrokenPipeError:
         sys.exit(0)